@@ -1,42 +1,87 @@
 #!/usr/bin/env python3
 
 import argparse
+import functools
 import os
+import shlex
 import sys
 from enum import IntEnum, IntFlag
 from struct import Struct
 
-# On Windows, ensure hidapi.dll is available
-if os.name == "nt":
-    import ctypes
+AIOC_VID = 0x1209
+AIOC_PID = 0x7388
 
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    dll_path = os.path.join(script_dir, "hidapi.dll")
-    try:
-        if os.path.exists(dll_path):
-            ctypes.WinDLL(dll_path)
-        else:
-            ctypes.WinDLL("hidapi.dll")
-    except OSError as e:
-        print("Could not load hidapi.dll:", e)
-        sys.exit(1)
+# Contents of the MAGIC register, "AIOC" read as a little-endian uint32
+_AIOC_MAGIC = int.from_bytes(b"AIOC", "little")
 
+# The 16-byte foxhunt message as four little-endian uint32 registers
+_MSG4 = Struct("<4L")
 
-import hid
+# Output report buffer reused for every raw PTT write
+_PTT_BUF = bytearray(5)
 
-AIOC_VID = 0x1209
-AIOC_PID = 0x7388
+# The hid module is only loaded once a device is actually needed
+_hid = None
+
+
+def _load_hid():
+    global _hid
+    if _hid is not None:
+        return _hid
+
+    # On Windows, ensure hidapi.dll is available
+    if os.name == "nt":
+        import ctypes
+
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        dll_path = os.path.join(script_dir, "hidapi.dll")
+        try:
+            if os.path.exists(dll_path):
+                ctypes.WinDLL(dll_path)
+            else:
+                ctypes.WinDLL("hidapi.dll")
+        except OSError as e:
+            print("Could not load hidapi.dll:", e)
+            sys.exit(1)
+
+    import hid
+
+    _hid = hid
+    return _hid
+
+
+@functools.lru_cache(maxsize=None)
+def _flag_bits(cls):
+    # (bit, name) for every single-bit member, lowest bit first
+    return tuple(
+        sorted((m.value, m.name) for m in cls.__members__.values() if m.value and not m.value & (m.value - 1))
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _flag_str(cls, value):
+    # Canonical members by name, anything else as its single-bit members plus leftover bits in hex
+    for name, member in cls.__members__.items():
+        if member.value == value:
+            return name
+    parts = []
+    rest = value
+    for bit, name in _flag_bits(cls):
+        if rest & bit:
+            parts.append(name)
+            rest &= ~bit
+    if parts and rest:
+        parts.append(hex(rest))
+    if parts:
+        return "|".join(parts)
+    return hex(value)
 
 
 class StrIntFlag(IntFlag):
     def __str__(self):
-        name = self.name
-        if name is not None:
-            return name
-        parts = [m.name for m in type(self) if m.value and (m in self)]
-        if parts:
-            return "|".join(parts)
-        return hex(self.value)
+        # Not self.name, which on Python 3.11+ is already set for composite values and
+        # spells unnamed bits in decimal
+        return _flag_str(type(self), self._value_)
 
 
 class Register(IntEnum):
@@ -110,45 +155,146 @@ class RXGain(IntEnum):
     RXGAIN8X = 0x00000003
     RXGAIN16X = 0x00000004
 
+
+FOXHUNT_MSG_REGISTERS = (
+    Register.FOXHUNT_MSG0,
+    Register.FOXHUNT_MSG1,
+    Register.FOXHUNT_MSG2,
+    Register.FOXHUNT_MSG3,
+)
+
+# Output of --list-ptt-sources
+_PTT_SOURCE_LIST = "".join(f"{src.name} (0x{src.value:08x})\n" for src in PTTSource)
+
+# __members__ rather than iteration, so NONE (a zero flag) can be parsed too
+_PTT_BY_NAME = {name: int(m) for name, m in PTTSource.__members__.items()}
+_BTN_BY_NAME = {name: int(m) for name, m in CM108ButtonSource.__members__.items()}
+
+# Map raw RX gain and TX boost register values back to readable names
+_RX_GAIN_STR = {
+    int(RXGain.RXGAIN1X): "1x",
+    int(RXGain.RXGAIN2X): "2x",
+    int(RXGain.RXGAIN4X): "4x",
+    int(RXGain.RXGAIN8X): "8x",
+    int(RXGain.RXGAIN16X): "16x",
+}
+_TX_BOOST_STR = {
+    int(TXBoost.TXBOOSTOFF): "off",
+    int(TXBoost.TXBOOSTON): "on",
+}
+
+
 def list_devices(vid, pid):
-    devices = hid.enumerate(vid, pid)
+    devices = _load_hid().enumerate(vid, pid)
     for device in devices:
         print(f"Serial: {device['serial_number']}, Path: {device['path']}")
 
+def _read_request(address):
+    return bytes((0, Command.NONE, address)) + b"\x00\x00\x00\x00"
+
+
+def _reply_value(data):
+    # A short or empty transfer must not turn into a bogus register value
+    if len(data) != 7:
+        raise ValueError(f"Unexpected feature report length {len(data)}, expected 7")
+    return int.from_bytes(data[3:7], "little")
+
+
+# Address-setting requests for read_all(), built once
+_READ_ALL_REQUESTS = [(r, _read_request(r.value)) for r in Register]
+
+
 def read(device, address):
     # Set address and read
-    request = Struct("<BBBL").pack(0, Command.NONE, address, 0x00000000)
-    device.send_feature_report(request)
-    data = device.get_feature_report(0, 7)
-    _, _, _, value = Struct("<BBBL").unpack(data)
-    return value
+    device.send_feature_report(_read_request(address))
+    return _reply_value(device.get_feature_report(0, 7))
 
 
 def write_feat_report(device, address, value):
-    data = Struct("<BBBL").pack(0, Command.WRITESTROBE, address, value)
+    data = bytes((0, Command.WRITESTROBE, address)) + value.to_bytes(4, "little")
     device.send_feature_report(data)
 
 def cmd(device, cmd):
-    data = Struct("<BBBL").pack(0, cmd, 0x00, 0x00000000)
+    data = bytes((0, cmd, 0, 0, 0, 0, 0))
     device.send_feature_report(data)
 
 
-def dump(device):
-    for r in Register:
-        print(f"Reg. {r.name}: {read(device, r.value):08x}")
+def read_all(device):
+    # One pass over all known registers, keyed by register
+    send = device.send_feature_report
+    get = device.get_feature_report
+    reply_value = _reply_value
+    regs = {}
+    for r, request in _READ_ALL_REQUESTS:
+        send(request)
+        regs[r] = reply_value(get(0, 7))
+    return regs
 
 
-def parse_args():
-    parser = argparse.ArgumentParser(
+def dump(regs):
+    # Emit the listing in one write rather than one print per register
+    lines = [f"Reg. {r.name}: {value:08x}" for r, value in regs.items()]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def _uint_arg(bits):
+    # argparse type for an unsigned integer (hex or decimal) that has to fit in the given number of bits
+    limit = 1 << bits
+
+    def convert(text):
+        try:
+            value = int(text, 0)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid integer: {text!r}")
+        if not 0 <= value < limit:
+            raise argparse.ArgumentTypeError(f"{text} is out of range (0-{limit - 1:#x})")
+        return value
+
+    return convert
+
+
+def _source_arg(parse):
+    # argparse type that turns "A|B" source names into their register value
+    def convert(text):
+        try:
+            return parse(text)
+        except KeyError as e:
+            raise argparse.ArgumentTypeError(f"unknown source {e}")
+
+    return convert
+
+
+class BatchError(Exception):
+    pass
+
+
+class _BatchLineParser(argparse.ArgumentParser):
+    # Hand errors in a batch line back to run_batch() instead of exiting
+    def error(self, message):
+        raise BatchError(message)
+
+
+def build_parser(batch_line=False):
+    parser_class = _BatchLineParser if batch_line else argparse.ArgumentParser
+    parser = parser_class(
         description="Utility for viewining configuring AIOC hardware settings.",
         epilog="Example: aioc-util.py --ptt1 VPTT --store",
         formatter_class=argparse.RawDescriptionHelpFormatter,
+        add_help=not batch_line,
     )
     parser.add_argument(
         "--defaults", action="store_true", help="Load hardware defaults"
     )
     parser.add_argument("--reboot", action="store_true", help="Reboot the device")
     parser.add_argument("--dump", action="store_true", help="Dump all known registers")
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        "--verify",
+        dest="verbose",
+        action="store_true",
+        help="Read back and print registers after changing them",
+    )
     parser.add_argument(
         "--swap-ptt", action="store_true", help="Swap PTT1/PTT2 sources"
     )
@@ -156,11 +302,13 @@ def parse_args():
     parser.add_argument(
         "--ptt1",
         metavar="SOURCE",
+        type=_source_arg(parse_ptt_source),
         help='Set arbitrary PTT1 source (e.g. "CM108GPIO1|SERIALDTR")',
     )
     parser.add_argument(
         "--ptt2",
         metavar="SOURCE",
+        type=_source_arg(parse_ptt_source),
         help='Set arbitrary PTT2 source (e.g. "CM108GPIO2|VPTT")',
     )
     parser.add_argument(
@@ -172,14 +320,14 @@ def parse_args():
         "--set-usb",
         nargs=2,
         metavar=("VID", "PID"),
-        type=lambda x: int(x, 0),
+        type=_uint_arg(16),
         help="Set USB VID and PID (hex or decimal)",
     )
     parser.add_argument(
         "--open-usb",
         nargs=2,
         metavar=("VID", "PID"),
-        type=lambda x: int(x, 0),
+        type=_uint_arg(16),
         help="USB VID and PID to use when opening the device (hex or decimal)",
     )
     parser.add_argument(
@@ -193,33 +341,39 @@ def parse_args():
         help="If multiple AIOCs are present, open a specific serial number. If --open-usb is specified, uses that VID/PID.",
     )
     parser.add_argument(
-        "--vol-up", metavar="SOURCE", help="Set Volume Up button source"
+        "--vol-up",
+        metavar="SOURCE",
+        type=_source_arg(parse_btn_source),
+        help="Set Volume Up button source",
     )
     parser.add_argument(
-        "--vol-dn", metavar="SOURCE", help="Set Volume Down button source"
+        "--vol-dn",
+        metavar="SOURCE",
+        type=_source_arg(parse_btn_source),
+        help="Set Volume Down button source",
     )
     parser.add_argument(
         "--vptt-lvlctrl",
         metavar="VALUE",
-        type=lambda x: int(x, 0),
+        type=_uint_arg(32),
         help="Set VPTT_LVLCTRL register (hex or decimal)",
     )
     parser.add_argument(
         "--vptt-timctrl",
         metavar="VALUE",
-        type=lambda x: int(x, 0),
+        type=_uint_arg(32),
         help="Set VPTT_TIMCTRL register (hex or decimal)",
     )
     parser.add_argument(
         "--vcos-lvlctrl",
         metavar="VALUE",
-        type=lambda x: int(x, 0),
+        type=_uint_arg(32),
         help="Set VCOS_LVLCTRL register (hex or decimal)",
     )
     parser.add_argument(
         "--vcos-timctrl",
         metavar="VALUE",
-        type=lambda x: int(x, 0),
+        type=_uint_arg(32),
         help="Set VCOS_TIMCTRL register (hex or decimal)",
     )
     parser.add_argument(
@@ -250,19 +404,19 @@ def parse_args():
     parser.add_argument(
         "--foxhunt-volume",
         metavar="VOLUME",
-        type=lambda x: int(x, 0),
+        type=_uint_arg(16),
         help="Set foxhunt volume (0-65535)",
     )
     parser.add_argument(
         "--foxhunt-wpm",
         metavar="WPM",
-        type=lambda x: int(x, 0),
+        type=_uint_arg(8),
         help="Set foxhunt words per minute (0-255)",
     )
     parser.add_argument(
         "--foxhunt-interval",
         metavar="INTERVAL",
-        type=lambda x: int(x, 0),
+        type=_uint_arg(8),
         help="Set foxhunt interval in seconds (0-255, 0 disables foxhunt mode)",
     )
     parser.add_argument(
@@ -297,7 +451,18 @@ def parse_args():
         action="store_true",
         help="Read and display current audio RX gain and TX boost settings",
     )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        # Batch lines may not nest batches, so do not open the file there
+        type=None if batch_line else argparse.FileType("r"),
+        help="Run the options on each line of FILE ('-' for stdin) against the same opened device",
+    )
+    return parser
 
+
+def parse_args():
+    parser = build_parser()
     args = parser.parse_args()
     if len(sys.argv) == 1:
         parser.print_help(sys.stderr)
@@ -306,124 +471,111 @@ def parse_args():
 
 
 def parse_ptt_source(val):
-    parts = val.split("|")
-    return sum(PTTSource[p] for p in parts)
+    v = 0
+    for p in val.split("|"):
+        v |= _PTT_BY_NAME[p]
+    return v
 
 
 def parse_btn_source(val):
-    parts = val.split("|")
-    return sum(CM108ButtonSource[p] for p in parts)
+    v = 0
+    for p in val.split("|"):
+        v |= _BTN_BY_NAME[p]
+    return v
 
 
 def set_ptt_state_raw(device, pin_num, state_on):
     state = 1 if state_on else 0
-    iomask = 1 << (pin_num - 1)
-    iodata = state << (pin_num - 1)
-    data = Struct("<BBBBB").pack(0, 0, iodata, iomask, 0)
-    device.write(bytes(data))
+    _PTT_BUF[2] = state << (pin_num - 1)  # iodata
+    _PTT_BUF[3] = 1 << (pin_num - 1)  # iomask
+    device.write(bytes(_PTT_BUF))
 
 
-def main():
-    args = parse_args()
+def do_defaults(aioc, args):
+    print("Loading Defaults...")
+    cmd(aioc, Command.DEFAULTS)
 
-    if args.list_ptt_sources:
-        for src in PTTSource:
-            print(f"{src.name} (0x{src.value:08x})")
-        sys.exit(0)
 
-    if args.open_usb:
-        vid_open, pid_open = args.open_usb
-    else:
-        vid_open, pid_open = AIOC_VID, AIOC_PID
+def do_dump(aioc, args):
+    print(f"Manufacturer: {aioc.manufacturer}")
+    print(f"Product: {aioc.product}")
+    print(f"Serial No: {aioc.serial}")
 
-    if args.list_devices:
-        list_devices(vid_open, pid_open)
-        sys.exit(0)
+    regs = read_all(aioc)
+    print(f"Magic: {regs[Register.MAGIC].to_bytes(4, 'little')}")
 
-    try:
-        aioc = hid.Device(vid=vid_open, pid=pid_open, serial=args.open_serialnum)
-    except (OSError, hid.HIDException) as e:
-        print(
-            f"Could not open AIOC device (VID: {vid_open:#06x}, PID: {pid_open:#06x}, Serial: {args.open_serialnum}):",
-            e,
-        )
-        sys.exit(1)
+    ptt1_source = PTTSource(regs[Register.AIOC_IOMUX0])
+    ptt2_source = PTTSource(regs[Register.AIOC_IOMUX1])
+
+    print(f"Current PTT1 Source: {ptt1_source}")
+    print(f"Current PTT2 Source: {ptt2_source}")
+
+    btn1_source = CM108ButtonSource(regs[Register.CM108_IOMUX0])
+    btn2_source = CM108ButtonSource(regs[Register.CM108_IOMUX1])
+    btn3_source = CM108ButtonSource(regs[Register.CM108_IOMUX2])
+    btn4_source = CM108ButtonSource(regs[Register.CM108_IOMUX3])
 
-    magic = Struct("<L").pack(read(aioc, Register.MAGIC))
-    if magic != b"AIOC":
-        print(f"Unexpected magic: {magic}")
-        sys.exit(-1)
-
-    if args.defaults:
-        print("Loading Defaults...")
-        cmd(aioc, Command.DEFAULTS)
-
-    if args.dump:
-        print(f"Manufacturer: {aioc.manufacturer}")
-        print(f"Product: {aioc.product}")
-        print(f"Serial No: {aioc.serial}")
-        print(f"Magic: {magic}")
-
-        ptt1_source = PTTSource(read(aioc, Register.AIOC_IOMUX0))
-        ptt2_source = PTTSource(read(aioc, Register.AIOC_IOMUX1))
-
-        print(f"Current PTT1 Source: {ptt1_source}")
-        print(f"Current PTT2 Source: {ptt2_source}")
-
-        btn1_source = CM108ButtonSource(read(aioc, Register.CM108_IOMUX0))
-        btn2_source = CM108ButtonSource(read(aioc, Register.CM108_IOMUX1))
-        btn3_source = CM108ButtonSource(read(aioc, Register.CM108_IOMUX2))
-        btn4_source = CM108ButtonSource(read(aioc, Register.CM108_IOMUX3))
-
-        print(f"Current CM108 Button 1 (VolUP) Source: {btn1_source}")
-        print(f"Current CM108 Button 2 (VolDN) Source: {btn2_source}")
-        print(f"Current CM108 Button 3 (PlbMute) Source: {btn3_source}")
-        print(f"Current CM108 Button 4 (RecMute) Source: {btn4_source}")
-
-        dump(aioc)
-
-    if args.swap_ptt:
-        p1, p2 = ptt2_source, ptt1_source
-        print(f"Setting PTT1 Source to {p1}")
-        write_feat_report(aioc, Register.AIOC_IOMUX0, p1)
-        print(f"Setting PTT2 Source to {p2}")
-        write_feat_report(aioc, Register.AIOC_IOMUX1, p2)
+    print(f"Current CM108 Button 1 (VolUP) Source: {btn1_source}")
+    print(f"Current CM108 Button 2 (VolDN) Source: {btn2_source}")
+    print(f"Current CM108 Button 3 (PlbMute) Source: {btn3_source}")
+    print(f"Current CM108 Button 4 (RecMute) Source: {btn4_source}")
+
+    dump(regs)
+
+
+def do_swap_ptt(aioc, args):
+    p1 = PTTSource(read(aioc, Register.AIOC_IOMUX1))
+    p2 = PTTSource(read(aioc, Register.AIOC_IOMUX0))
+    print(f"Setting PTT1 Source to {p1}")
+    write_feat_report(aioc, Register.AIOC_IOMUX0, p1)
+    print(f"Setting PTT2 Source to {p2}")
+    write_feat_report(aioc, Register.AIOC_IOMUX1, p2)
+    if args.verbose:
         print(f"Now PTT1 Source: {PTTSource(read(aioc, Register.AIOC_IOMUX0))}")
         print(f"Now PTT2 Source: {PTTSource(read(aioc, Register.AIOC_IOMUX1))}")
 
-    if args.auto_ptt1:
-        print(f"Setting PTT1 Source to {PTTSource.VPTT}")
-        write_feat_report(aioc, Register.AIOC_IOMUX0, PTTSource.VPTT)
+
+def do_auto_ptt1(aioc, args):
+    print(f"Setting PTT1 Source to {PTTSource.VPTT}")
+    write_feat_report(aioc, Register.AIOC_IOMUX0, PTTSource.VPTT)
+    if args.verbose:
         print(f"Now PTT1 Source: {PTTSource(read(aioc, Register.AIOC_IOMUX0))}")
         print(f"Now PTT2 Source: {PTTSource(read(aioc, Register.AIOC_IOMUX1))}")
 
-    if args.ptt1 or args.ptt2:
-        if args.ptt1:
-            val1 = parse_ptt_source(args.ptt1)
-            print(f"Setting PTT1 Source to {PTTSource(val1)}")
-            write_feat_report(aioc, Register.AIOC_IOMUX0, PTTSource(val1))
-        if args.ptt2:
-            val2 = parse_ptt_source(args.ptt2)
-            print(f"Setting PTT2 Source to {PTTSource(val2)}")
-            write_feat_report(aioc, Register.AIOC_IOMUX1, PTTSource(val2))
+
+def do_ptt_sources(aioc, args):
+    if args.ptt1 is not None:
+        val1 = args.ptt1
+        print(f"Setting PTT1 Source to {PTTSource(val1)}")
+        write_feat_report(aioc, Register.AIOC_IOMUX0, val1)
+    if args.ptt2 is not None:
+        val2 = args.ptt2
+        print(f"Setting PTT2 Source to {PTTSource(val2)}")
+        write_feat_report(aioc, Register.AIOC_IOMUX1, val2)
+    if args.verbose:
         print(f"Now PTT1 Source: {PTTSource(read(aioc, Register.AIOC_IOMUX0))}")
         print(f"Now PTT2 Source: {PTTSource(read(aioc, Register.AIOC_IOMUX1))}")
 
-    if args.set_usb:
-        vid, pid = args.set_usb
-        value = (pid << 16) | (vid << 0)
-        write_feat_report(aioc, Register.USBID, value)
+
+def do_set_usb(aioc, args):
+    vid, pid = args.set_usb
+    value = (pid << 16) | (vid << 0)
+    print(f"Setting USBID to {value:08x}")
+    write_feat_report(aioc, Register.USBID, value)
+    if args.verbose:
         print(f"Now USBID: {read(aioc, Register.USBID):08x}")
 
-    if args.vol_up or args.vol_dn:
-        if args.vol_up:
-            su = parse_btn_source(args.vol_up)
-            print(f"Setting VolUP button source to {CM108ButtonSource(su)}")
-            write_feat_report(aioc, Register.CM108_IOMUX0, CM108ButtonSource(su))
-        if args.vol_dn:
-            sd = parse_btn_source(args.vol_dn)
-            print(f"Setting VolDN button source to {CM108ButtonSource(sd)}")
-            write_feat_report(aioc, Register.CM108_IOMUX1, CM108ButtonSource(sd))
+
+def do_button_sources(aioc, args):
+    if args.vol_up is not None:
+        su = args.vol_up
+        print(f"Setting VolUP button source to {CM108ButtonSource(su)}")
+        write_feat_report(aioc, Register.CM108_IOMUX0, su)
+    if args.vol_dn is not None:
+        sd = args.vol_dn
+        print(f"Setting VolDN button source to {CM108ButtonSource(sd)}")
+        write_feat_report(aioc, Register.CM108_IOMUX1, sd)
+    if args.verbose:
         print(
             f"Now VolUP button source: {CM108ButtonSource(read(aioc, Register.CM108_IOMUX0))}"
         )
@@ -431,83 +583,79 @@ def main():
             f"Now VolDN button source: {CM108ButtonSource(read(aioc, Register.CM108_IOMUX1))}"
         )
 
-    if args.vptt_lvlctrl is not None:
-        print(f"Setting VPTT_LVLCTRL to {args.vptt_lvlctrl:#x}")
-        write_feat_report(aioc, Register.VPTT_LVLCTRL, args.vptt_lvlctrl)
-        print(f"Now VPTT_LVLCTRL: {read(aioc, Register.VPTT_LVLCTRL):08x}")
-
-    if args.vptt_timctrl is not None:
-        print(f"Setting VPTT_TIMCTRL to {args.vptt_timctrl:#x}")
-        write_feat_report(aioc, Register.VPTT_TIMCTRL, args.vptt_timctrl)
-        print(f"Now VPTT_TIMCTRL: {read(aioc, Register.VPTT_TIMCTRL):08x}")
-
-    if args.vcos_lvlctrl is not None:
-        print(f"Setting VCOS_LVLCTRL to {args.vcos_lvlctrl:#x}")
-        write_feat_report(aioc, Register.VCOS_LVLCTRL, args.vcos_lvlctrl)
-        print(f"Now VCOS_LVLCTRL: {read(aioc, Register.VCOS_LVLCTRL):08x}")
-
-    if args.vcos_timctrl is not None:
-        print(f"Setting VCOS_TIMCTRL to {args.vcos_timctrl:#x}")
-        write_feat_report(aioc, Register.VCOS_TIMCTRL, args.vcos_timctrl)
-        print(f"Now VCOS_TIMCTRL: {read(aioc, Register.VCOS_TIMCTRL):08x}")
-
-    if args.enable_hwcos:
-        print("Enabling hardware COS (if your aioc supports it)...")
-        write_feat_report(aioc, Register.CM108_IOMUX0, CM108ButtonSource.NONE)
-        write_feat_report(aioc, Register.CM108_IOMUX1, CM108ButtonSource.IN2)
+
+def do_write_register(register, attr, aioc, args):
+    value = getattr(args, attr)
+    print(f"Setting {register.name} to {value:#x}")
+    write_feat_report(aioc, register, value)
+    if args.verbose:
+        print(f"Now {register.name}: {read(aioc, register):08x}")
+
+
+# Options that write their value straight into a register
+REGISTER_OPTIONS = [
+    ("vptt_lvlctrl", Register.VPTT_LVLCTRL),
+    ("vptt_timctrl", Register.VPTT_TIMCTRL),
+    ("vcos_lvlctrl", Register.VCOS_LVLCTRL),
+    ("vcos_timctrl", Register.VCOS_TIMCTRL),
+]
+
+
+def do_enable_hwcos(aioc, args):
+    print("Enabling hardware COS (if your aioc supports it)...")
+    write_feat_report(aioc, Register.CM108_IOMUX0, CM108ButtonSource.NONE)
+    write_feat_report(aioc, Register.CM108_IOMUX1, CM108ButtonSource.IN2)
+    if args.verbose:
         print(f"Now CM108_IOMUX0: {CM108ButtonSource(read(aioc, Register.CM108_IOMUX0))}")
         print(f"Now CM108_IOMUX1: {CM108ButtonSource(read(aioc, Register.CM108_IOMUX1))}")
 
-    if args.enable_vcos:
-        print("Enabling virtual COS...")
-        write_feat_report(aioc, Register.CM108_IOMUX0, CM108ButtonSource.IN2)
-        write_feat_report(aioc, Register.CM108_IOMUX1, CM108ButtonSource.VCOS)
+
+def do_enable_vcos(aioc, args):
+    print("Enabling virtual COS...")
+    write_feat_report(aioc, Register.CM108_IOMUX0, CM108ButtonSource.IN2)
+    write_feat_report(aioc, Register.CM108_IOMUX1, CM108ButtonSource.VCOS)
+    if args.verbose:
         print(f"Now CM108_IOMUX0: {CM108ButtonSource(read(aioc, Register.CM108_IOMUX0))}")
         print(f"Now CM108_IOMUX1: {CM108ButtonSource(read(aioc, Register.CM108_IOMUX1))}")
 
-    # Read and display foxhunt settings
-    if args.foxhunt_get_settings:
-        current_foxhunt = read(aioc, Register.FOXHUNT_CTRL)
-        current_volume = (current_foxhunt >> 16) & 0xFFFF
-        current_wpm = (current_foxhunt >> 8) & 0xFF
-        current_interval = (current_foxhunt >> 0) & 0xFF
-        print(f"Current foxhunt settings:")
-        print(f"  Volume: {current_volume}")
-        print(f"  WPM: {current_wpm}")
-        print(f"  Interval: {current_interval} seconds")
-        print(f"  Raw register: {current_foxhunt:08x}")
-
-    # Read and display foxhunt message
-    if args.foxhunt_get_message:
-        msg_registers = [
-            Register.FOXHUNT_MSG0,
-            Register.FOXHUNT_MSG1,
-            Register.FOXHUNT_MSG2,
-            Register.FOXHUNT_MSG3
-        ]
-
-        # Read all 4 message registers and convert to bytes
-        message_bytes = bytearray()
-        print(f"Current foxhunt message registers:")
-        for i, reg in enumerate(msg_registers):
-            uint32_val = read(aioc, reg)
-            # Convert uint32 to 4 bytes (little-endian)
-            reg_bytes = uint32_val.to_bytes(4, byteorder='little')
-            message_bytes.extend(reg_bytes)
-            print(f"  MSG{i}: {uint32_val:08x} ('{reg_bytes.decode('ascii', errors='replace')}')")
-
-        # Convert bytes to string, stopping at first null byte
-        try:
-            null_index = message_bytes.index(0)
-            message_str = message_bytes[:null_index].decode('ascii', errors='replace')
-        except ValueError:
-            # No null byte found, use entire 16 bytes
-            message_str = message_bytes.decode('ascii', errors='replace')
 
-        print(f"Current foxhunt message: '{message_str}'")
-
-    # Handle foxhunt control register
-    if args.foxhunt_volume is not None or args.foxhunt_wpm is not None or args.foxhunt_interval is not None:
+# Read and display foxhunt settings
+def do_foxhunt_get_settings(aioc, args):
+    current_foxhunt = read(aioc, Register.FOXHUNT_CTRL)
+    current_volume = (current_foxhunt >> 16) & 0xFFFF
+    current_wpm = (current_foxhunt >> 8) & 0xFF
+    current_interval = (current_foxhunt >> 0) & 0xFF
+    lines = [
+        "Current foxhunt settings:",
+        f"  Volume: {current_volume}",
+        f"  WPM: {current_wpm}",
+        f"  Interval: {current_interval} seconds",
+        f"  Raw register: {current_foxhunt:08x}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Read and display foxhunt message
+def do_foxhunt_get_message(aioc, args):
+    # Read all 4 message registers and convert to bytes (little-endian)
+    msg_values = [read(aioc, reg) for reg in FOXHUNT_MSG_REGISTERS]
+    message_bytes = _MSG4.pack(*msg_values)
+    message_text = message_bytes.decode('ascii', errors='replace')
+    print(f"Current foxhunt message registers:")
+    for i, uint32_val in enumerate(msg_values):
+        print(f"  MSG{i}: {uint32_val:08x} ('{message_text[i * 4:(i + 1) * 4]}')")
+
+    # Convert bytes to string, stopping at first null byte (entire 16 bytes if there is none)
+    null_index = message_bytes.find(b'\x00')
+    message_str = message_bytes[:null_index if null_index != -1 else 16].decode('ascii', errors='replace')
+
+    print(f"Current foxhunt message: '{message_str}'")
+
+
+# Handle foxhunt control register
+def do_foxhunt_ctrl(aioc, args):
+    new_volume, new_wpm, new_interval = args.foxhunt_volume, args.foxhunt_wpm, args.foxhunt_interval
+    if new_volume is None or new_wpm is None or new_interval is None:
         # Read current values
         current_foxhunt = read(aioc, Register.FOXHUNT_CTRL)
         current_volume = (current_foxhunt >> 16) & 0xFFFF
@@ -515,105 +663,208 @@ def main():
         current_interval = (current_foxhunt >> 0) & 0xFF
 
         # Use new values if provided, otherwise keep current values
-        new_volume = args.foxhunt_volume if args.foxhunt_volume is not None else current_volume
-        new_wpm = args.foxhunt_wpm if args.foxhunt_wpm is not None else current_wpm
-        new_interval = args.foxhunt_interval if args.foxhunt_interval is not None else current_interval
-
-        # Pack new values and write
-        new_foxhunt = (new_volume << 16) | (new_wpm << 8) | (new_interval << 0)
-        print(f"Setting FOXHUNT_CTRL: volume={new_volume}, wpm={new_wpm}, interval={new_interval}")
-        write_feat_report(aioc, Register.FOXHUNT_CTRL, new_foxhunt)
+        new_volume = new_volume if new_volume is not None else current_volume
+        new_wpm = new_wpm if new_wpm is not None else current_wpm
+        new_interval = new_interval if new_interval is not None else current_interval
+
+    # Pack new values and write
+    new_foxhunt = (new_volume << 16) | (new_wpm << 8) | (new_interval << 0)
+    print(f"Setting FOXHUNT_CTRL: volume={new_volume}, wpm={new_wpm}, interval={new_interval}")
+    write_feat_report(aioc, Register.FOXHUNT_CTRL, new_foxhunt)
+    if args.verbose:
         print(f"Now FOXHUNT_CTRL: {read(aioc, Register.FOXHUNT_CTRL):08x}")
 
-    # Handle foxhunt message
-    if args.foxhunt_message is not None:
-        # Convert string to bytes and pad/truncate to 16 bytes
-        message_bytes = args.foxhunt_message.encode('ascii', errors='replace')[:16]
-        message_bytes = message_bytes.ljust(16, b'\x00')  # Pad with nulls to 16 bytes
-
-        # Convert 16 bytes to 4 uint32 values (little-endian)
-        msg_registers = [
-            Register.FOXHUNT_MSG0,
-            Register.FOXHUNT_MSG1,
-            Register.FOXHUNT_MSG2,
-            Register.FOXHUNT_MSG3
-        ]
-
-        print(f"Setting foxhunt message: '{args.foxhunt_message}'")
-        for i in range(4):
-            # Extract 4 bytes and convert to uint32 (little-endian)
-            byte_offset = i * 4
-            uint32_val = int.from_bytes(message_bytes[byte_offset:byte_offset+4], byteorder='little')
-            write_feat_report(aioc, msg_registers[i], uint32_val)
-            print(f"  MSG{i}: {uint32_val:08x} ('{message_bytes[byte_offset:byte_offset+4].decode('ascii', errors='replace')}')")
-
-    # Read and display audio settings
-    if args.audio_get_settings:
-        current_rx = read(aioc, Register.AUDIO_RX)
-        current_tx = read(aioc, Register.AUDIO_TX)
-
-        # Map RX gain values back to readable names
-        rx_gain_names = {
-            RXGain.RXGAIN1X: "1x",
-            RXGain.RXGAIN2X: "2x",
-            RXGain.RXGAIN4X: "4x",
-            RXGain.RXGAIN8X: "8x",
-            RXGain.RXGAIN16X: "16x"
-        }
-
-        # Map TX boost values back to readable names
-        tx_boost_names = {
-            TXBoost.TXBOOSTOFF: "off",
-            TXBoost.TXBOOSTON: "on"
-        }
-
-        rx_gain_name = rx_gain_names.get(RXGain(current_rx), f"unknown ({current_rx:08x})")
-        tx_boost_name = tx_boost_names.get(TXBoost(current_tx), f"unknown ({current_tx:08x})")
-
-        print(f"Current audio settings:")
-        print(f"  RX Gain: {rx_gain_name}")
-        print(f"  TX Boost: {tx_boost_name}")
-        print(f"  Raw AUDIO_RX: {current_rx:08x}")
-        print(f"  Raw AUDIO_TX: {current_tx:08x}")
-
-    # Handle audio RX gain
-    if args.audio_rx_gain is not None:
-        gain_map = {
-            "1x": RXGain.RXGAIN1X,
-            "2x": RXGain.RXGAIN2X,
-            "4x": RXGain.RXGAIN4X,
-            "8x": RXGain.RXGAIN8X,
-            "16x": RXGain.RXGAIN16X
-        }
-        rxgain = gain_map[args.audio_rx_gain]
-        print(f"Setting Audio RX gain to {rxgain.name}")
-        write_feat_report(aioc, Register.AUDIO_RX, rxgain)
+
+# Handle foxhunt message
+def do_foxhunt_message(aioc, args):
+    # Convert string to bytes and pad/truncate to 16 bytes
+    message_bytes = args.foxhunt_message.encode('ascii', errors='replace')[:16]
+    message_bytes = message_bytes.ljust(16, b'\x00')  # Pad with nulls to 16 bytes
+
+    print(f"Setting foxhunt message: '{args.foxhunt_message}'")
+    # Convert 16 bytes to 4 uint32 values (little-endian)
+    msg_values = _MSG4.unpack(message_bytes)
+    message_text = message_bytes.decode('ascii', errors='replace')
+    for i, (reg, uint32_val) in enumerate(zip(FOXHUNT_MSG_REGISTERS, msg_values)):
+        write_feat_report(aioc, reg, uint32_val)
+        print(f"  MSG{i}: {uint32_val:08x} ('{message_text[i * 4:(i + 1) * 4]}')")
+
+
+# Read and display audio settings
+def do_audio_get_settings(aioc, args):
+    current_rx = read(aioc, Register.AUDIO_RX)
+    current_tx = read(aioc, Register.AUDIO_TX)
+
+    rx_gain_name = _RX_GAIN_STR.get(current_rx, f"unknown ({current_rx:08x})")
+    tx_boost_name = _TX_BOOST_STR.get(current_tx, f"unknown ({current_tx:08x})")
+
+    lines = [
+        "Current audio settings:",
+        f"  RX Gain: {rx_gain_name}",
+        f"  TX Boost: {tx_boost_name}",
+        f"  Raw AUDIO_RX: {current_rx:08x}",
+        f"  Raw AUDIO_TX: {current_tx:08x}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Handle audio RX gain
+def do_audio_rx_gain(aioc, args):
+    gain_map = {
+        "1x": RXGain.RXGAIN1X,
+        "2x": RXGain.RXGAIN2X,
+        "4x": RXGain.RXGAIN4X,
+        "8x": RXGain.RXGAIN8X,
+        "16x": RXGain.RXGAIN16X
+    }
+    rxgain = gain_map[args.audio_rx_gain]
+    print(f"Setting Audio RX gain to {rxgain.name}")
+    write_feat_report(aioc, Register.AUDIO_RX, rxgain)
+    if args.verbose:
         print(f"Now AUDIO_RX: {read(aioc, Register.AUDIO_RX):08x}")
 
-    # Handle audio TX boost
-    if args.audio_tx_boost is not None:
-        boost_map = {
-            "off": TXBoost.TXBOOSTOFF,
-            "on": TXBoost.TXBOOSTON
-        }
-        txboost = boost_map[args.audio_tx_boost]
-        print(f"Setting Audio TX boost to {txboost.name}")
-        write_feat_report(aioc, Register.AUDIO_TX, txboost)
+
+# Handle audio TX boost
+def do_audio_tx_boost(aioc, args):
+    boost_map = {
+        "off": TXBoost.TXBOOSTOFF,
+        "on": TXBoost.TXBOOSTON
+    }
+    txboost = boost_map[args.audio_tx_boost]
+    print(f"Setting Audio TX boost to {txboost.name}")
+    write_feat_report(aioc, Register.AUDIO_TX, txboost)
+    if args.verbose:
         print(f"Now AUDIO_TX: {read(aioc, Register.AUDIO_TX):08x}")
 
-    if args.store:
-        print("Storing...")
-        cmd(aioc, Command.STORE)
 
-    if args.set_ptt1_state:
-        set_ptt_state_raw(aioc, PTTChannel.PTT1, args.set_ptt1_state == "on")
+def do_store(aioc, args):
+    print("Storing...")
+    cmd(aioc, Command.STORE)
+
+
+def do_set_ptt1_state(aioc, args):
+    set_ptt_state_raw(aioc, PTTChannel.PTT1, args.set_ptt1_state == "on")
+
+
+def do_set_ptt2_state(aioc, args):
+    set_ptt_state_raw(aioc, PTTChannel.PTT2, args.set_ptt2_state == "on")
+
+
+def do_reboot(aioc, args):
+    print("Rebooting device...")
+    cmd(aioc, Command.REBOOT)
+
+
+# Actions in the order they are applied, keyed by the options that trigger them
+ACTIONS = [
+    (("defaults",), do_defaults),
+    (("dump",), do_dump),
+    (("swap_ptt",), do_swap_ptt),
+    (("auto_ptt1",), do_auto_ptt1),
+    (("ptt1", "ptt2"), do_ptt_sources),
+    (("set_usb",), do_set_usb),
+    (("vol_up", "vol_dn"), do_button_sources),
+    *[((attr,), functools.partial(do_write_register, register, attr)) for attr, register in REGISTER_OPTIONS],
+    (("enable_hwcos",), do_enable_hwcos),
+    (("enable_vcos",), do_enable_vcos),
+    (("foxhunt_get_settings",), do_foxhunt_get_settings),
+    (("foxhunt_get_message",), do_foxhunt_get_message),
+    (("foxhunt_volume", "foxhunt_wpm", "foxhunt_interval"), do_foxhunt_ctrl),
+    (("foxhunt_message",), do_foxhunt_message),
+    (("audio_get_settings",), do_audio_get_settings),
+    (("audio_rx_gain",), do_audio_rx_gain),
+    (("audio_tx_boost",), do_audio_tx_boost),
+    (("store",), do_store),
+    (("set_ptt1_state",), do_set_ptt1_state),
+    (("set_ptt2_state",), do_set_ptt2_state),
+    (("reboot",), do_reboot),
+]
+
+
+def _given(value):
+    # store_true options default to False, the others to None
+    return value is not None and value is not False
+
+
+def run_actions(aioc, args):
+    for attrs, handler in ACTIONS:
+        if any(_given(getattr(args, attr)) for attr in attrs):
+            handler(aioc, args)
+
+
+# Options that pick, list or batch devices, which a batch line cannot do on the already opened device
+_BATCH_LINE_REJECTED = ("open_usb", "open_serialnum", "list_devices", "list_ptt_sources", "batch")
+
+
+def _batch_error(batch, lineno, message):
+    print(f"{batch.name}, line {lineno}: {message}", file=sys.stderr)
+    sys.exit(1)
+
+
+def run_batch(aioc, args):
+    parser = build_parser(batch_line=True)
+    with args.batch:
+        lines = list(args.batch)
+
+    # Parse every line up front, including source names and value ranges,
+    # so a bad line stops the batch before any of it is applied
+    batch = []
+    for lineno, line in enumerate(lines, 1):
+        try:
+            argv = shlex.split(line, comments=True)
+            if not argv:
+                continue
+            line_args = parser.parse_args(argv)
+        except (BatchError, ValueError) as e:
+            _batch_error(args.batch, lineno, e)
+        rejected = [f"--{attr.replace('_', '-')}" for attr in _BATCH_LINE_REJECTED if _given(getattr(line_args, attr))]
+        if rejected:
+            _batch_error(args.batch, lineno, f"{', '.join(rejected)} cannot be used in a batch line")
+        line_args.verbose = line_args.verbose or args.verbose
+        batch.append(line_args)
+
+    for line_args in batch:
+        run_actions(aioc, line_args)
+
+
+def main():
+    args = parse_args()
+
+    if args.list_ptt_sources:
+        sys.stdout.write(_PTT_SOURCE_LIST)
+        sys.exit(0)
+
+    if args.open_usb:
+        vid_open, pid_open = args.open_usb
+    else:
+        vid_open, pid_open = AIOC_VID, AIOC_PID
+
+    if args.list_devices:
+        list_devices(vid_open, pid_open)
+        sys.exit(0)
+
+    hid = _load_hid()
+    try:
+        aioc = hid.Device(vid=vid_open, pid=pid_open, serial=args.open_serialnum)
+    except (OSError, hid.HIDException) as e:
+        print(
+            f"Could not open AIOC device (VID: {vid_open:#06x}, PID: {pid_open:#06x}, Serial: {args.open_serialnum}):",
+            e,
+        )
+        sys.exit(1)
+
+    # Close the device on every way out, so it is free again for the next invocation
+    with aioc:
+        magic_val = read(aioc, Register.MAGIC)
+        if magic_val != _AIOC_MAGIC:
+            print(f"Unexpected magic: {magic_val:#010x}")
+            sys.exit(-1)
 
-    if args.set_ptt2_state:
-        set_ptt_state_raw(aioc, PTTChannel.PTT2, args.set_ptt2_state == "on")
+        # Batch lines go first, so e.g. --store or --reboot on the command line applies after them
+        if args.batch:
+            run_batch(aioc, args)
 
-    if args.reboot:
-        print("Rebooting device...")
-        cmd(aioc, Command.REBOOT)
+        run_actions(aioc, args)
 
 
 if __name__ == "__main__":